@@ -5,6 +5,9 @@ from pptx import Presentation
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 
+_GROUP = MSO_SHAPE_TYPE.GROUP
+_TABLE = MSO_SHAPE_TYPE.TABLE
+
 def hex_to_rgb(hex_str):
     """Convert hex string (e.g. 'FF0000') to RGBColor object."""
     hex_str = hex_str.lstrip('#')
@@ -18,15 +21,16 @@ def process_text_frame(text_frame, color_obj):
 
 def process_shape(shape, color_obj):
     """Recursively process shapes to find text and apply color."""
+    shape_type = shape.shape_type
     # 1. Handle Groups
-    if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+    if shape_type == _GROUP:
         if hasattr(shape, "shapes"):
             for child in shape.shapes:
                 process_shape(child, color_obj)
         return
 
     # 2. Handle Tables
-    if shape.shape_type == MSO_SHAPE_TYPE.TABLE:
+    if shape_type == _TABLE:
         for row in shape.table.rows:
             for cell in row.cells:
                 if hasattr(cell, "text_frame"):
@@ -61,12 +65,11 @@ def main():
         prs = Presentation(input_path)
         color_obj = hex_to_rgb(args.color)
         
-        count = 0
-        for slide in prs.slides:
+        total = len(prs.slides)
+        for count, slide in enumerate(prs.slides, start=1):
             for shape in slide.shapes:
                 process_shape(shape, color_obj)
-            count += 1
-            print(f"Processed Slide {count}/{len(prs.slides)}", end='\r')
+            print(f"Processed Slide {count}/{total}", end='\r')
             
         print(f"\nSaving to '{output_path}'...")
         prs.save(output_path)
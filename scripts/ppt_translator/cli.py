@@ -33,8 +33,14 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--max-workers",
         type=int,
-        default=4,
-        help="Number of worker threads used while reading slides.",
+        default=None,
+        help="Number of worker processes used while reading slides (default: CPU count).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Maximum number of translation requests in flight at once.",
     )
     parser.add_argument(
         "--keep-intermediate",
@@ -73,11 +79,13 @@ def run_cli(argv: Sequence[str] | None = None) -> int:
                 source_lang=args.source_lang,
                 target_lang=args.target_lang,
                 max_workers=args.max_workers,
+                concurrency=args.concurrency,
                 cleanup=not args.keep_intermediate,
             )
         except Exception as exc:  # pragma: no cover - CLI logging
             print(f"Error processing {ppt_file}: {exc}")
             exit_code = 1
+    translator.flush()
     return exit_code
 
 
@@ -1,21 +1,95 @@
 """PowerPoint translation pipeline utilities."""
 from __future__ import annotations
 
-import json
+import asyncio
+import os
 import re
-import xml.etree.ElementTree as ET
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Executor, ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, Any, Dict, List
-from xml.dom import minidom
+from typing import Optional, Any, Dict, List, Tuple
 
+from lxml import etree as ET
 from pptx import Presentation
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 from pptx.enum.text import MSO_ANCHOR, PP_ALIGN
+from pptx.oxml.ns import qn
 from pptx.util import Pt, Emu
 
 from .translation import TranslationService
+from .utils import dumps_json, loads_json
+
+# Control characters below 0x20 except tab, newline and carriage return.
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Single-pass escaping of run text before it is wrapped in <rN> tags.
+_TAG_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+# <rN>content</rN> pairs (non-greedy content) and stray run tags.
+_RUN_TAG_RE = re.compile(r"<r(\d+)>(.*?)</r\1>", re.DOTALL)
+_STRIP_RUN_TAG_RE = re.compile(r"</?r\d+>")
+# Entities decoded in translated run text: the escapes above plus quotes and
+# numeric references. Named HTML entities are left alone.
+_TAG_ENTITY_RE = re.compile(r"&(?:(amp|lt|gt|quot|apos)|#(\d+)|#[xX]([0-9a-fA-F]+));")
+_TAG_ENTITIES = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "apos": "'"}
+
+# Extracted properties of one slide (shape index -> shape/table data) and of a
+# whole deck (slide number -> slide payload).
+SlidePayload = Dict[str, Dict[str, Any]]
+PresentationPayload = Dict[int, SlidePayload]
+
+# Shape types checked on every step of the recursive shape walks.
+_GROUP = MSO_SHAPE_TYPE.GROUP
+_TABLE = MSO_SHAPE_TYPE.TABLE
+
+# DrawingML tags written directly when rebuilding a text body.
+_A_P = qn("a:p")
+_A_R = qn("a:r")
+_A_T = qn("a:t")
+_A_END_PARA_RPR = qn("a:endParaRPr")
+# Paragraph content removed when a text body is cleared (pPr is kept).
+_PARAGRAPH_CONTENT_TAGS = frozenset((_A_R, qn("a:br"), qn("a:fld")))
+
+
+class RunData:
+    """Text and character formatting of a single run."""
+
+    __slots__ = ("text", "font_size", "font_name", "bold", "italic", "font_color")
+
+    def __init__(
+        self,
+        text: str = "",
+        font_size: float | None = None,
+        font_name: str | None = None,
+        bold: bool | None = None,
+        italic: bool | None = None,
+        font_color: str | None = None,
+    ):
+        self.text = text
+        self.font_size = font_size
+        self.font_name = font_name
+        self.bold = bold
+        self.italic = italic
+        self.font_color = font_color
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunData":
+        return cls(
+            data.get("text") or "",
+            data.get("font_size"),
+            data.get("font_name"),
+            data.get("bold"),
+            data.get("italic"),
+            data.get("font_color"),
+        )
+
+
+def _json_default(obj: Any) -> Any:
+    """JSON encoder hook for payload objects that are not plain containers."""
+    if isinstance(obj, RunData):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 def get_alignment_value(alignment_str: str | None):
@@ -77,35 +151,29 @@ def get_text_frame_properties(text_frame) -> Dict[str, Any]:
 
         # Extract info for each run
         for run in paragraph.runs:
-            run_data = {
-                "text": run.text,
-                "font_size": None,
-                "font_name": None,
-                "bold": None,
-                "italic": None,
-                "font_color": None,
-            }
-            
-            if getattr(run.font, "size", None) is not None:
-                run_data["font_size"] = run.font.size.pt
-            if getattr(run.font, "name", None):
-                run_data["font_name"] = run.font.name
-            if hasattr(run.font, "bold"):
-                run_data["bold"] = run.font.bold
-            if hasattr(run.font, "italic"):
-                run_data["italic"] = run.font.italic
+            # run.font builds a new wrapper on every access; bind it once.
+            font = run.font
+            size = font.size
+            run_data = RunData(
+                run.text,
+                size.pt if size is not None else None,
+                font.name or None,
+                font.bold,
+                font.italic,
+            )
             
             # Safe color extraction
-            if getattr(run.font, "color", None):
-                try:
-                    # check type if possible, or just try-except rgb access
-                    if hasattr(run.font.color, "rgb") and run.font.color.rgb is not None:
-                        run_data["font_color"] = str(run.font.color.rgb)
-                    # Note: We currently skip Theme Colors to avoid complexity, 
-                    # meaning theme-colored text will revert to default theme color, 
-                    # which is usually correct for the new PPT.
-                except Exception:
-                    pass
+            try:
+                color = font.color
+                # check type if possible, or just try-except rgb access
+                rgb = color.rgb if color.type is not None else None
+                if rgb is not None:
+                    run_data.font_color = str(rgb)
+                # Note: We currently skip Theme Colors to avoid complexity, 
+                # meaning theme-colored text will revert to default theme color, 
+                # which is usually correct for the new PPT.
+            except Exception:
+                pass
 
             p_data["runs"].append(run_data)
             
@@ -119,7 +187,7 @@ def remove_control_characters(s):
     if not s:
         return s
     # Keep newlines (\n, \r) and tabs (\t), remove others < 32
-    return "".join(c for c in s if c >= ' ' or c in '\n\r\t')
+    return _CONTROL_CHARS_RE.sub("", s)
 
 
 def apply_text_frame_properties(text_frame, data: Dict[str, Any], font_scale: float = 0.7):
@@ -127,19 +195,34 @@ def apply_text_frame_properties(text_frame, data: Dict[str, Any], font_scale: fl
     if not data.get("paragraphs"):
         return
 
-    # Clear existing content. 
-    # text_frame.clear() removes all paragraphs but leaves one empty one.
-    text_frame.clear() 
+    # The <a:p>/<a:r>/<a:t> elements are built directly on the lxml tree;
+    # going through add_paragraph()/add_run() costs several python-pptx
+    # proxy objects and descriptor calls per run.
+    txBody = text_frame._txBody
+
+    # Clear existing content, as text_frame.clear() does: drop all paragraphs
+    # but the first, and empty that one while keeping its pPr/endParaRPr.
+    p_elements = txBody.findall(_A_P)
+    for p in p_elements[1:]:
+        txBody.remove(p)
+    first_p = p_elements[0] if p_elements else ET.SubElement(txBody, _A_P)
+    for child in list(first_p):
+        if child.tag in _PARAGRAPH_CONTENT_TAGS:
+            first_p.remove(child)
+    # Runs go before endParaRPr, which must stay the last child.
+    end_para_rpr = first_p.find(_A_END_PARA_RPR)
+    if end_para_rpr is not None:
+        first_p.remove(end_para_rpr)
 
     for idx, p_data in enumerate(data["paragraphs"]):
         # Reuse the first empty paragraph for the first item, add new ones for others
         if idx == 0:
-            paragraph = text_frame.paragraphs[0]
+            paragraph = first_p
         else:
-            paragraph = text_frame.add_paragraph()
+            paragraph = ET.SubElement(txBody, _A_P)
             
         if "level" in p_data:
-            paragraph.level = p_data["level"]
+            paragraph.get_or_add_pPr().lvl = p_data["level"]
 
         # Apply paragraph formatting
         # DEBUG: Commenting out to prevent corruption
@@ -157,48 +240,48 @@ def apply_text_frame_properties(text_frame, data: Dict[str, Any], font_scale: fl
         
         # Backward compatibility
         if not runs_data and "text" in p_data:
-             runs_data = [{
-                 "text": p_data["text"],
-                 "font_size": p_data.get("font_size"),
-                 "font_name": p_data.get("font_name"),
-                 "bold": p_data.get("bold"),
-                 "italic": p_data.get("italic"),
-                 "font_color": p_data.get("font_color")
-             }]
+             runs_data = [RunData.from_dict(p_data)]
 
         for run_info in runs_data:
-            text_content = run_info.get("text", "")
+            # Payloads loaded back from XML hold plain dicts.
+            if isinstance(run_info, dict):
+                run_info = RunData.from_dict(run_info)
+            text_content = run_info.text
             if not text_content:
                 continue
                 
-            run = paragraph.add_run()
-            # SANITIZE: This is critical for preventing file corruption
-            run.text = remove_control_characters(text_content)
+            run = ET.SubElement(paragraph, _A_R)
+            # SANITIZE: This is critical for preventing file corruption.
+            # Carriage returns are escaped as the python-pptx run.text setter does.
+            ET.SubElement(run, _A_T).text = remove_control_characters(text_content).replace("\r", "_x000D_")
 
             # Apply font formatting
             # DEBUG: Commenting out formatting to isolate corruption source
-            # if run_info.get("font_size"):
-            #     adjusted_size = run_info["font_size"] * font_scale
+            # if run_info.font_size:
+            #     adjusted_size = run_info.font_size * font_scale
             #     run.font.size = Pt(adjusted_size)
             
-            # if run_info.get("font_name"):
-            #     run.font.name = run_info["font_name"]
+            # if run_info.font_name:
+            #     run.font.name = run_info.font_name
             
-            # if run_info.get("font_color"):
+            # if run_info.font_color:
             #     try:
-            #         run.font.color.rgb = RGBColor.from_string(run_info["font_color"])
+            #         run.font.color.rgb = RGBColor.from_string(run_info.font_color)
             #     except Exception:
             #         pass 
 
             # # Only assign if not None to avoid clearing inheritance
-            # if run_info.get("bold") is not None:
-            #     run.font.bold = run_info["bold"]
-            # if run_info.get("italic") is not None:
-            #     run.font.italic = run_info["italic"]
+            # if run_info.bold is not None:
+            #     run.font.bold = run_info.bold
+            # if run_info.italic is not None:
+            #     run.font.italic = run_info.italic
 
+    if end_para_rpr is not None:
+        first_p.append(end_para_rpr)
 
-def get_shape_properties(shape):
-    """Extract text shape properties."""
+
+def get_shape_properties(shape, text_frame=None):
+    """Extract text shape properties; ``text_frame`` may be passed if already resolved."""
     shape_data = {
         "width": shape.width,
         "height": shape.height,
@@ -207,14 +290,16 @@ def get_shape_properties(shape):
         "text_content": {} # container for text frame data
     }
     
-    if hasattr(shape, "text_frame"):
-        shape_data["text_content"] = get_text_frame_properties(shape.text_frame)
+    if text_frame is None:
+        text_frame = getattr(shape, "text_frame", None)
+    if text_frame is not None:
+        shape_data["text_content"] = get_text_frame_properties(text_frame)
         
     return shape_data
 
 
-def apply_shape_properties(shape, shape_data):
-    """Apply saved properties to a shape."""
+def apply_shape_properties(shape, shape_data, text_frame=None):
+    """Apply saved properties to a shape; ``text_frame`` may be passed if already resolved."""
     try:
         # SKIP GEOMETRY RESTORATION to prevent file corruption.
         # Translating text changes its length; forcing original dimensions 
@@ -226,8 +311,10 @@ def apply_shape_properties(shape, shape_data):
         # if "left" in shape_data: shape.left = Emu(shape_data["left"])
         # if "top" in shape_data: shape.top = Emu(shape_data["top"])
         
-        if hasattr(shape, "text_frame") and "text_content" in shape_data:
-            apply_text_frame_properties(shape.text_frame, shape_data["text_content"], font_scale=0.7)
+        if text_frame is None:
+            text_frame = getattr(shape, "text_frame", None)
+        if text_frame is not None and "text_content" in shape_data:
+            apply_text_frame_properties(text_frame, shape_data["text_content"], font_scale=0.7)
             
     except Exception as exc:  # pragma: no cover - best effort logging
         print(f"Error applying shape properties: {exc}")
@@ -285,209 +372,365 @@ def apply_table_properties(table, table_data):
                 print(f"Error setting cell properties: {exc}")
 
 
-def serialize_runs_to_tagged_text(runs_data: List[Dict[str, Any]]) -> str:
+def serialize_runs_to_tagged_text(runs_data: List[RunData]) -> str:
     """Convert runs to tagged text for translation (e.g., <r0>Hello</r0><r1>World</r1>)."""
     tagged_parts = []
     for idx, run in enumerate(runs_data):
-        text = run.get("text", "")
+        text = run.text
         if text:
-            # Simple XML escaping might be needed if text contains < or >
-            # But deepseek usually handles mixed content well.
-            # Let's do basic escaping to be safe.
-            safe_text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            # Escape markup characters so they cannot be mistaken for run tags.
+            safe_text = text.translate(_TAG_ESCAPE_TABLE)
             tagged_parts.append(f"<r{idx}>{safe_text}</r{idx}>")
     return "".join(tagged_parts)
 
 
-def parse_tagged_text_to_runs(tagged_text: str, original_runs: List[Dict[str, Any]]) -> None:
+def _unescape_entity(match: re.Match) -> str:
+    name, decimal, hexadecimal = match.groups()
+    if name:
+        return _TAG_ENTITIES[name]
+    codepoint = int(decimal) if decimal else int(hexadecimal, 16)
+    if codepoint > 0x10FFFF or 0xD800 <= codepoint <= 0xDFFF:
+        return match.group(0)
+    return chr(codepoint)
+
+
+def _unescape_tag_text(text: str) -> str:
+    """Decode the entities ``serialize_runs_to_tagged_text`` and the model may produce."""
+    if "&" not in text:
+        return text
+    return _TAG_ENTITY_RE.sub(_unescape_entity, text)
+
+
+def parse_tagged_text_to_runs(tagged_text: str, original_runs: List[RunData]) -> None:
     """Parse translated tagged text and update original runs."""
-    # Pattern to match <rN>content</rN>
-    # Uses non-greedy match for content
-    pattern = re.compile(r"<r(\d+)>(.*?)</r\1>", re.DOTALL)
-    
-    matches = pattern.findall(tagged_text)
-    
-    # If no tags found but we expected tags (and input wasn't empty), it's a failure.
-    # However, if original had no text, matches will be empty, which is fine.
-    
     found_ids = set()
+    matched = False
     
-    if matches:
-        # Clear all runs first to avoid ghost text from missing tags
-        for run in original_runs:
-            run["text"] = ""
-            
-        for run_id_str, content in matches:
-            try:
-                run_id = int(run_id_str)
-                if 0 <= run_id < len(original_runs):
-                    # Unescape basic entities
-                    text = content.replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&")
-                    
-                    original_runs[run_id]["text"] = text
-                    found_ids.add(run_id)
-            except ValueError:
-                continue
-    else:
+    for match in _RUN_TAG_RE.finditer(tagged_text):
+        if not matched:
+            # Clear all runs first to avoid ghost text from missing tags
+            for run in original_runs:
+                run.text = ""
+            matched = True
+        run_id = int(match.group(1))
+        if 0 <= run_id < len(original_runs):
+            # Unescape entities, including numeric ones the model may emit
+            original_runs[run_id].text = _unescape_tag_text(match.group(2))
+            found_ids.add(run_id)
+
+    # If no tags found but we expected tags (and input wasn't empty), it's a failure.
+    # However, if original had no text, nothing matches, which is fine.
+    if not matched:
         # Fallback: AI likely stripped tags.
         print(f"[DEBUG] WARNING: No tags found in translated text: {tagged_text[:50]}...")
         # Put everything in the first run if it exists.
         if original_runs:
             # Strip potential leftover broken tags if any, or just take raw
-            clean_text = re.sub(r"</?r\d+>", "", tagged_text).strip()
+            clean_text = _STRIP_RUN_TAG_RE.sub("", tagged_text).strip()
             if clean_text:
                 # Clear all first
                 for run in original_runs:
-                    run["text"] = ""
+                    run.text = ""
                 # Assign to first run
-                original_runs[0]["text"] = clean_text
+                original_runs[0].text = clean_text
+
+
+def _has_alphabetic(text: str) -> bool:
+    """Return True if ``text`` contains at least one letter (in any script)."""
+    return any(c.isalpha() for c in text)
+
+
+def _collect_translation_tasks(paragraphs: List[Dict[str, Any]], translation_tasks: List[tuple]) -> None:
+    """Queue every paragraph containing letters as ``(paragraph, text)``."""
+    for paragraph in paragraphs:
+        if "runs" in paragraph and paragraph["runs"]:
+            # Check the raw run texts: the tagged form escapes markup into
+            # entities whose names would count as letters.
+            if _has_alphabetic("".join(run.text for run in paragraph["runs"])):
+                # Defer translation
+                translation_tasks.append((paragraph, serialize_runs_to_tagged_text(paragraph["runs"])))
+        elif "text" in paragraph and _has_alphabetic(paragraph["text"]):
+            translation_tasks.append((paragraph, paragraph["text"]))
 
 
 def process_shape(
     shape,
     shape_index_str: str,
-    parent_element: ET.Element,
+    shape_payload: SlidePayload,
     translation_tasks: List[tuple],
-    deferred_writes: List[tuple],
 ):
-    """Recursively process a shape or group, collecting translation tasks and deferred XML writes."""
-    if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+    """Recursively process a shape or group, collecting its properties and translation tasks."""
+    # shape_type is re-derived from the XML on every access; read it once.
+    shape_type = shape.shape_type
+    if shape_type == _GROUP:
         if hasattr(shape, "shapes"):
             for child_idx, child_shape in enumerate(shape.shapes):
                 child_index_str = f"{shape_index_str}:{child_idx}"
-                process_shape(child_shape, child_index_str, parent_element, translation_tasks, deferred_writes)
+                process_shape(child_shape, child_index_str, shape_payload, translation_tasks)
         return
 
-    if shape.shape_type == MSO_SHAPE_TYPE.TABLE:
-        table_element = ET.SubElement(parent_element, "table_element")
-        table_element.set("shape_index", shape_index_str)
+    if shape_type == _TABLE:
         table_data = get_table_properties(shape.table)
         
         # Iterate through all cells and their paragraphs
         for row in table_data["cells"]:
-            for paragraph in row["text_content"]["paragraphs"]:
-                if "runs" in paragraph and paragraph["runs"]:
-                    tagged_text = serialize_runs_to_tagged_text(paragraph["runs"])
-                    if tagged_text.strip():
-                        # Defer translation
-                        translation_tasks.append((paragraph, tagged_text))
-                elif "text" in paragraph and paragraph["text"].strip():
-                    translation_tasks.append((paragraph, paragraph["text"]))
-
-        props_element = ET.SubElement(table_element, "properties")
-        # Defer writing JSON to XML until after translation updates table_data
-        deferred_writes.append((props_element, table_data))
-        
-    elif hasattr(shape, "text_frame"): 
-        text_element = ET.SubElement(parent_element, "text_element")
-        text_element.set("shape_index", shape_index_str)
-        shape_data = get_shape_properties(shape)
+            for cell in row:
+                _collect_translation_tasks(cell["text_content"]["paragraphs"], translation_tasks)
+
+        shape_payload[shape_index_str] = table_data
+        return
+
+    text_frame = getattr(shape, "text_frame", None)
+    if text_frame is not None:
+        shape_data = get_shape_properties(shape, text_frame)
         
         if "text_content" in shape_data:
-            for paragraph in shape_data["text_content"]["paragraphs"]:
-                 if "runs" in paragraph and paragraph["runs"]:
-                    tagged_text = serialize_runs_to_tagged_text(paragraph["runs"])
-                    if tagged_text.strip():
-                        translation_tasks.append((paragraph, tagged_text))
-                 elif "text" in paragraph and paragraph["text"].strip():
-                    translation_tasks.append((paragraph, paragraph["text"]))
-
-        props_element = ET.SubElement(text_element, "properties")
-        # Defer writing JSON to XML until after translation updates shape_data
-        deferred_writes.append((props_element, shape_data))
-
-
-def extract_text_from_slide(
-    slide,
-    slide_number: int,
+            _collect_translation_tasks(shape_data["text_content"]["paragraphs"], translation_tasks)
+
+        shape_payload[shape_index_str] = shape_data
+
+
+def extract_text_from_slide(slide, slide_number: int) -> Tuple[SlidePayload, List[tuple]]:
+    """Extract a slide, returning ``(shape_payload, translation_tasks)``."""
+    shape_payload: SlidePayload = {}
+    translation_tasks = [] # List of (paragraph_data, text_to_translate)
+    
+    for shape_index, shape in enumerate(slide.shapes):
+        process_shape(shape, str(shape_index), shape_payload, translation_tasks)
+
+    return shape_payload, translation_tasks
+
+
+def extract_slide_range(
+    ppt_path: str, start: int, stop: int
+) -> List[Tuple[int, SlidePayload, List[tuple]]]:
+    """Extract slides ``start`` to ``stop`` (0-based, exclusive) of ``ppt_path`` in a worker process."""
+    # python-pptx objects cannot be pickled, so each worker opens its own copy.
+    slides = Presentation(ppt_path).slides
+    results = []
+    for slide_index in range(start, stop):
+        shape_payload, translation_tasks = extract_text_from_slide(slides[slide_index], slide_index + 1)
+        results.append((slide_index + 1, shape_payload, translation_tasks))
+    return results
+
+
+def apply_slide_translations(translation_tasks: List[tuple], translated_texts: List[str]) -> None:
+    """Write translated texts back into the paragraphs collected for a slide."""
+    # Apply results (Update the dictionary objects in memory)
+    for (paragraph, original_text), translated_text in zip(translation_tasks, translated_texts):
+        if "runs" in paragraph:
+            parse_tagged_text_to_runs(translated_text, paragraph["runs"])
+        else:
+            paragraph["text"] = translated_text
+
+
+# Sentinel closing a pipeline queue.
+_END_OF_STREAM = None
+
+
+async def _extract_producer(
+    ppt_path: str,
+    total: int,
+    executor: Executor,
+    workers: int,
+    q_out: asyncio.Queue,
+    payload: PresentationPayload,
+    original_root: ET.Element | None,
+) -> None:
+    """Stage 1: extract slide ranges in worker processes and queue their translation tasks."""
+    loop = asyncio.get_running_loop()
+    slides_per_task = max(1, -(-total // (workers * 2)))
+    pending = [
+        loop.run_in_executor(executor, extract_slide_range, ppt_path, start, min(start + slides_per_task, total))
+        for start in range(0, total, slides_per_task)
+    ]
+
+    slide_payloads: List[Optional[SlidePayload]] = [None] * total
+    original_elements: List[Optional[ET.Element]] = [None] * total
+    for next_done in asyncio.as_completed(pending):
+        for slide_number, shape_payload, translation_tasks in await next_done:
+            slide_payloads[slide_number - 1] = shape_payload
+            # Translation mutates the payload, so snapshot the original before queueing.
+            if original_root is not None:
+                original_elements[slide_number - 1] = build_slide_element(slide_number, shape_payload)
+            await q_out.put(translation_tasks)
+    await q_out.put(_END_OF_STREAM)
+
+    for slide_number, shape_payload in enumerate(slide_payloads, start=1):
+        payload[slide_number] = shape_payload
+    if original_root is not None:
+        original_root.extend(original_elements)
+
+
+async def _translate_stage(
+    q_in: asyncio.Queue,
+    q_out: asyncio.Queue,
+    sem: asyncio.Semaphore,
+    *,
+    translator: TranslationService,
+    source_lang: str,
+    target_lang: str,
+) -> None:
+    """Stage 2: pack queued tasks into size-bounded batches and translate them concurrently."""
+    in_flight: List[asyncio.Task] = []
+    # text -> tasks waiting for it, while it is pending or in flight
+    waiting: Dict[str, List[tuple]] = {}
+    # text -> translation, once its batch has come back
+    translated_texts: Dict[str, str] = {}
+
+    async def _translate(texts: List[str]) -> None:
+        async with sem:
+            translated = await translator.translate_batch_json_async(texts, source_lang, target_lang)
+        # No await between recording a result and claiming its waiters, so a
+        # repeat seen later always finds the text in translated_texts.
+        tasks, results = [], []
+        for text, result in zip(texts, translated):
+            translated_texts[text] = result
+            for task in waiting.pop(text):
+                tasks.append(task)
+                results.append(result)
+        await q_out.put((tasks, results))
+
+    batch: List[str] = []
+    batch_chars = 0
+    try:
+        while True:
+            translation_tasks = await q_in.get()
+            if translation_tasks is _END_OF_STREAM:
+                break
+            for task in translation_tasks:
+                text = task[1]
+                if text in translated_texts:
+                    await q_out.put(([task], [translated_texts[text]]))
+                    continue
+                if text in waiting:
+                    waiting[text].append(task)
+                    continue
+                waiting[text] = [task]
+
+                if not translator.fits_in_batch(batch_chars, len(batch), len(text)):
+                    in_flight.append(asyncio.create_task(_translate(batch)))
+                    batch = []
+                    batch_chars = 0
+                batch.append(text)
+                batch_chars += len(text)
+
+        if batch:
+            in_flight.append(asyncio.create_task(_translate(batch)))
+        await asyncio.gather(*in_flight)
+    except BaseException:
+        # Don't leave sibling batches running on the shared event loop.
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+        raise
+    finally:
+        await q_out.put(_END_OF_STREAM)
+
+
+async def _finalize(q_in: asyncio.Queue) -> None:
+    """Stage 3: write translated batches back into the payload as they complete."""
+    while True:
+        item = await q_in.get()
+        if item is _END_OF_STREAM:
+            break
+        batch, translated = item
+        apply_slide_translations(batch, translated)
+
+
+async def _run_stages(*stages) -> None:
+    """Run pipeline stages together, cancelling the rest if one of them fails."""
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def _pipeline(
+    ppt_path: str,
+    total: int,
+    executor: Executor,
+    workers: int,
     *,
     translator: TranslationService | None,
     source_lang: str,
     target_lang: str,
-):
-    """Extract text from a slide and optionally translate it using batching."""
-    slide_element = ET.Element("slide")
-    slide_element.set("number", str(slide_number))
-    
-    translation_tasks = [] # List of (paragraph_data, text_to_translate)
-    deferred_writes = []   # List of (xml_element, data_object)
-    
-    for shape_index, shape in enumerate(slide.shapes):
-        process_shape(
-            shape, 
-            str(shape_index), 
-            slide_element, 
-            translation_tasks,
-            deferred_writes
-        )
-    
-    # Batch Translate if we have tasks
-    if translator and translation_tasks:
-        texts_to_translate = [t[1] for t in translation_tasks]
-        
-        # Use batch JSON translation
-        translated_texts = translator.translate_batch_json(texts_to_translate, source_lang, target_lang)
-        
-        # Apply results (Update the dictionary objects in memory)
-        for (paragraph, original_text), translated_text in zip(translation_tasks, translated_texts):
-            if "runs" in paragraph:
-                parse_tagged_text_to_runs(translated_text, paragraph["runs"])
-            else:
-                paragraph["text"] = translated_text
-    
-    # Finally, write the UPDATED objects to XML
-    for props_element, data_object in deferred_writes:
-        props_element.text = json.dumps(data_object, indent=2, ensure_ascii=False)
-            
-    return slide_element
+    concurrency: int,
+    original_root: ET.Element | None,
+) -> PresentationPayload:
+    """Run extraction, translation and write-back as overlapping stages."""
+    payload: PresentationPayload = {}
+    extracted: asyncio.Queue = asyncio.Queue()
+    producer = _extract_producer(ppt_path, total, executor, workers, extracted, payload, original_root)
+
+    if translator is None:
+        async def _drain() -> None:
+            while await extracted.get() is not _END_OF_STREAM:
+                pass
+
+        await _run_stages(producer, _drain())
+        return payload
+
+    translated: asyncio.Queue = asyncio.Queue()
+    await _run_stages(
+        producer,
+        _translate_stage(
+            extracted,
+            translated,
+            asyncio.Semaphore(max(1, concurrency)),
+            translator=translator,
+            source_lang=source_lang,
+            target_lang=target_lang,
+        ),
+        _finalize(translated),
+    )
+    return payload
 
 
 def ppt_to_xml(
     ppt_path: str,
+    output_path: Path | None = None,
     *,
+    original_output_path: Path | None = None,
     translator: TranslationService | None,
     source_lang: str,
     target_lang: str,
-    max_workers: int = 4,
-) -> Optional[str]:
-    """Convert a PowerPoint presentation to XML."""
-    root = ET.Element("presentation")
-    base_dir = Path(ppt_path).parent
+    max_workers: int | None = None,
+    concurrency: int = 16,
+) -> Optional[PresentationPayload]:
+    """Extract and translate the text content of a PowerPoint presentation."""
     try:
-        prs = Presentation(ppt_path)
-        root.set("file_path", Path(ppt_path).name)
-        workers = max(1, max_workers)
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            future_to_slide = {
-                executor.submit(
-                    extract_text_from_slide,
-                    slide,
-                    slide_number,
-                    translator=translator,
-                    source_lang=source_lang,
-                    target_lang=target_lang,
-                ): slide_number
-                for slide_number, slide in enumerate(prs.slides, start=1)
-            }
-            # Sort results by slide number to ensure correct order in XML
-            # (Though concurrent execution doesn't guarantee order, collecting futures does)
-            
-            # Wait for all futures
-            results = []
-            for future in future_to_slide:
-                results.append((future_to_slide[future], future.result()))
-            
-            # Sort by slide number
-            results.sort(key=lambda x: x[0])
-            
-            for slide_number, slide_element in results:
-                root.append(slide_element)
-                # We can skip saving individual slide XMLs to reduce IO unless debugging
-                if False: # Disable per-slide debug file for performance/cleanup
-                     intermediate_path = base_dir / f"slide_{slide_number}_{'translated' if translator else 'original'}.xml"
-                     # ... saving logic ...
-        
-        return minidom.parseString(ET.tostring(root)).toprettyxml(indent="  ")
+        total = len(Presentation(ppt_path).slides)
+        file_name = Path(ppt_path).name
+        original_root = None
+        if original_output_path is not None:
+            original_root = ET.Element("presentation")
+            original_root.set("file_path", file_name)
+
+        workers = max(1, min(max_workers or os.cpu_count() or 1, total or 1))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pipeline = _pipeline(
+                ppt_path,
+                total,
+                executor,
+                workers,
+                translator=translator,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                concurrency=concurrency,
+                original_root=original_root,
+            )
+            payload = translator.run_coroutine(pipeline) if translator else asyncio.run(pipeline)
+
+        if original_root is not None:
+            write_xml(original_root, original_output_path)
+        if output_path is not None:
+            write_xml(build_presentation_element(file_name, payload), output_path)
+        return payload
     except Exception as exc:  # pragma: no cover - best effort logging
         print(f"Error processing presentation: {exc}")
         import traceback
@@ -495,57 +738,92 @@ def ppt_to_xml(
         return None
 
 
-def process_shape_apply(shape, shape_index_str: str, xml_slide: ET.Element):
-    """Recursively apply properties to a shape or group from XML."""
-    if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+def build_slide_element(slide_number: int, shape_payload: SlidePayload) -> ET.Element:
+    """Render one slide's payload as a ``<slide>`` XML element."""
+    slide_element = ET.Element("slide")
+    slide_element.set("number", str(slide_number))
+    for shape_index, data_object in shape_payload.items():
+        tag = "table_element" if "cells" in data_object else "text_element"
+        shape_element = ET.SubElement(slide_element, tag)
+        shape_element.set("shape_index", shape_index)
+        props_element = ET.SubElement(shape_element, "properties")
+        props_element.text = dumps_json(data_object, indent=True, default=_json_default)
+    return slide_element
+
+
+def build_presentation_element(file_name: str, payload: PresentationPayload) -> ET.Element:
+    """Render a payload as the intermediate ``<presentation>`` XML tree."""
+    root = ET.Element("presentation")
+    root.set("file_path", file_name)
+    for slide_number, shape_payload in payload.items():
+        root.append(build_slide_element(slide_number, shape_payload))
+    return root
+
+
+def write_xml(root: ET.Element, path: Path) -> None:
+    """Stream ``root`` to ``path`` as pretty-printed UTF-8 XML."""
+    ET.ElementTree(root).write(str(path), pretty_print=True, encoding="utf-8", xml_declaration=True)
+
+
+def load_payload_from_xml(xml_path: str) -> PresentationPayload:
+    """Read a payload back from XML written by :func:`ppt_to_xml`."""
+    root = ET.parse(xml_path).getroot()
+    payload: PresentationPayload = {}
+    for xml_slide in root.findall("slide"):
+        shape_payload: SlidePayload = {}
+        for element in xml_slide.iter("text_element", "table_element"):
+            props_element = element.find("properties")
+            if props_element is not None and props_element.text:
+                try:
+                    shape_payload[element.get("shape_index")] = loads_json(props_element.text)
+                except Exception as exc:  # pragma: no cover
+                    print(f"Error reading properties of shape {element.get('shape_index')}: {exc}")
+        payload[int(xml_slide.get("number"))] = shape_payload
+    return payload
+
+
+def process_shape_apply(shape, shape_index_str: str, shape_payload: SlidePayload):
+    """Recursively apply properties to a shape or group from the slide payload."""
+    shape_type = shape.shape_type
+    if shape_type == _GROUP:
         if hasattr(shape, "shapes"):
             for child_idx, child_shape in enumerate(shape.shapes):
                 child_index_str = f"{shape_index_str}:{child_idx}"
-                process_shape_apply(child_shape, child_index_str, xml_slide)
+                process_shape_apply(child_shape, child_index_str, shape_payload)
         return
 
-    if shape.shape_type == MSO_SHAPE_TYPE.TABLE:
-        table_element = xml_slide.find(f".//table_element[@shape_index='{shape_index_str}']")
-        if table_element is not None:
-            props_element = table_element.find("properties")
-            if props_element is not None and props_element.text:
-                try:
-                    table_data = json.loads(props_element.text)
-                    apply_table_properties(shape.table, table_data)
-                except Exception as exc:  # pragma: no cover
-                    print(f"Error applying table properties: {exc}")
-    
-    elif hasattr(shape, "text_frame"):
-        text_element = xml_slide.find(f".//text_element[@shape_index='{shape_index_str}']")
-        if text_element is not None:
-            props_element = text_element.find("properties")
-            if props_element is not None and props_element.text:
-                try:
-                    shape_data = json.loads(props_element.text)
-                    apply_shape_properties(shape, shape_data)
-                except Exception as exc:  # pragma: no cover
-                    print(f"Error applying shape properties: {exc}")
+    if shape_type == _TABLE:
+        table_data = shape_payload.get(shape_index_str)
+        if table_data is not None:
+            try:
+                apply_table_properties(shape.table, table_data)
+            except Exception as exc:  # pragma: no cover
+                print(f"Error applying table properties: {exc}")
+        return
 
+    text_frame = getattr(shape, "text_frame", None)
+    if text_frame is not None:
+        shape_data = shape_payload.get(shape_index_str)
+        if shape_data is not None:
+            try:
+                apply_shape_properties(shape, shape_data, text_frame)
+            except Exception as exc:  # pragma: no cover
+                print(f"Error applying shape properties: {exc}")
 
-def create_translated_ppt(original_ppt_path: str, translated_xml_path: str, output_ppt_path: str) -> None:
-    """Create a new PowerPoint presentation using translated content."""
+
+def create_translated_ppt_from_payload(
+    original_ppt_path: str, payload: PresentationPayload, output_ppt_path: str
+) -> None:
+    """Create a new PowerPoint presentation from an in-memory translated payload."""
     try:
         prs = Presentation(original_ppt_path)
-        tree = ET.parse(translated_xml_path)
-        root = tree.getroot()
-        
-        # Build map of slide number to xml element
-        slide_map = {}
-        for xml_slide in root.findall("slide"):
-            slide_map[int(xml_slide.get("number"))] = xml_slide
-            
         for slide_number, slide in enumerate(prs.slides, start=1):
-            xml_slide = slide_map.get(slide_number)
-            if xml_slide is None:
+            shape_payload = payload.get(slide_number)
+            if shape_payload is None:
                 continue
-                
+
             for shape_index, shape in enumerate(slide.shapes):
-                process_shape_apply(shape, str(shape_index), xml_slide)
+                process_shape_apply(shape, str(shape_index), shape_payload)
                                 
         prs.save(output_ppt_path)
         print(f"Translated PowerPoint saved to: {output_ppt_path}")
@@ -555,6 +833,16 @@ def create_translated_ppt(original_ppt_path: str, translated_xml_path: str, outp
         traceback.print_exc()
 
 
+def create_translated_ppt(original_ppt_path: str, translated_xml_path: str, output_ppt_path: str) -> None:
+    """Create a new PowerPoint presentation using translated content from XML."""
+    try:
+        payload = load_payload_from_xml(translated_xml_path)
+    except Exception as exc:  # pragma: no cover - logging only
+        print(f"Error reading translated XML: {exc}")
+        return
+    create_translated_ppt_from_payload(original_ppt_path, payload, output_ppt_path)
+
+
 def cleanup_intermediate_files(base_dir: Path, pattern: str = "slide_*.xml") -> None:
     """Remove intermediate XML files."""
     try:
@@ -570,7 +858,8 @@ def process_ppt_file(
     translator: TranslationService,
     source_lang: str,
     target_lang: str,
-    max_workers: int = 4,
+    max_workers: int | None = None,
+    concurrency: int = 16,
     cleanup: bool = True,
 ) -> Optional[Path]:
     """Process a single PowerPoint file from extraction to translated output."""
@@ -580,43 +869,31 @@ def process_ppt_file(
         raise ValueError(f"'{ppt_path}' is not a PowerPoint file.")
 
     base_dir = ppt_path.parent
+    keep_xml = not cleanup
+    original_output_path = base_dir / f"{ppt_path.stem}_original.xml" if keep_xml else None
+    translated_output_path = base_dir / f"{ppt_path.stem}_translated.xml" if keep_xml else None
 
-    print(f"Generating original XML for {ppt_path.name}...")
-    original_xml = ppt_to_xml(
-        str(ppt_path),
-        translator=None,
-        source_lang=source_lang,
-        target_lang=target_lang,
-        max_workers=max_workers,
-    )
-    if original_xml:
-        original_output_path = base_dir / f"{ppt_path.stem}_original.xml"
-        with open(original_output_path, "w", encoding="utf-8") as handle:
-            handle.write(original_xml)
-        print(f"Original XML saved: {original_output_path}")
-
-    print(
-        f"Generating translated XML (from {source_lang} to {target_lang}) for {ppt_path.name}..."
-    )
-    translated_xml = ppt_to_xml(
+    print(f"Extracting and translating {ppt_path.name} (from {source_lang} to {target_lang})...")
+    payload = ppt_to_xml(
         str(ppt_path),
+        translated_output_path,
+        original_output_path=original_output_path,
         translator=translator,
         source_lang=source_lang,
         target_lang=target_lang,
         max_workers=max_workers,
+        concurrency=concurrency,
     )
-    if not translated_xml:
+    if payload is None:
         return None
-
-    translated_output_path = base_dir / f"{ppt_path.stem}_translated.xml"
-    with open(translated_output_path, "w", encoding="utf-8") as handle:
-        handle.write(translated_xml)
-    print(f"Translated XML saved: {translated_output_path}")
+    if keep_xml:
+        print(f"Original XML saved: {original_output_path}")
+        print(f"Translated XML saved: {translated_output_path}")
 
     print(f"Creating translated PPT for {ppt_path.name}...")
     output_filename = f"{ppt_path.stem}_translated{ppt_path.suffix}"
     output_ppt_path = base_dir / output_filename
-    create_translated_ppt(str(ppt_path), str(translated_output_path), str(output_ppt_path))
+    create_translated_ppt_from_payload(str(ppt_path), payload, str(output_ppt_path))
 
     if cleanup:
         cleanup_intermediate_files(base_dir)
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import os
 
-from anthropic import Anthropic
+from anthropic import Anthropic, APIConnectionError
 
 from .base import ProviderConfigurationError, TranslationProvider
 
@@ -12,6 +12,7 @@ class AnthropicProvider(TranslationProvider):
     """Translate content using Anthropic's Messages API."""
 
     api_key_env = "ANTHROPIC_API_KEY"
+    transient_errors = (TimeoutError, ConnectionError, APIConnectionError)
 
     def __init__(self, model: str, *, api_key: str | None = None, max_tokens: int = 4096, temperature: float = 0.3) -> None:
         super().__init__(model, temperature=temperature)
@@ -1,11 +1,15 @@
 """Base classes for translation providers."""
 from __future__ import annotations
 
+import asyncio
 import os
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Type
 
-from openai import OpenAI
+from openai import APIConnectionError, OpenAI
+
+# HTTP statuses worth retrying besides 5xx: request timeout, conflict, rate limit.
+_TRANSIENT_STATUS_CODES = frozenset({408, 409, 429})
 
 
 class ProviderConfigurationError(RuntimeError):
@@ -15,6 +19,9 @@ class ProviderConfigurationError(RuntimeError):
 class TranslationProvider(ABC):
     """Abstract provider responsible for translating text."""
 
+    # Exceptions signalling a temporary failure that a retry may fix.
+    transient_errors: Tuple[Type[BaseException], ...] = (TimeoutError, ConnectionError)
+
     def __init__(self, model: str, temperature: float = 0.3) -> None:
         self.model = model
         self.temperature = temperature
@@ -23,12 +30,35 @@ class TranslationProvider(ABC):
     def translate(self, text: str, source_lang: str, target_lang: str) -> str:
         """Translate ``text`` from ``source_lang`` to ``target_lang``."""
 
+    async def translate_async(self, text: str, source_lang: str, target_lang: str) -> str:
+        """Awaitable :meth:`translate`; runs the blocking call in a worker thread by default."""
+        return await asyncio.to_thread(self.translate, text, source_lang, target_lang)
+
+    def is_transient_error(self, exc: BaseException) -> bool:
+        """Return True if ``exc`` is a temporary failure worth retrying.
+
+        Covers :attr:`transient_errors` and SDK errors carrying a retryable
+        HTTP ``status_code``. Anything else (bad credentials, invalid
+        requests) is treated as permanent.
+        """
+        if isinstance(exc, self.transient_errors):
+            return True
+        return self.is_transient_status(getattr(exc, "status_code", None))
+
+    @staticmethod
+    def is_transient_status(status: Optional[int]) -> bool:
+        """Return True for HTTP statuses worth retrying (408, 409, 429 and 5xx)."""
+        if not isinstance(status, int):
+            return False
+        return status in _TRANSIENT_STATUS_CODES or status >= 500
+
 
 class OpenAICompatibleProvider(TranslationProvider):
     """Provider implementation for OpenAI compatible chat completion APIs."""
 
     api_key_env: str = "OPENAI_API_KEY"
     default_base_url: str | None = None
+    transient_errors = (TimeoutError, ConnectionError, APIConnectionError)
 
     def __init__(
         self,
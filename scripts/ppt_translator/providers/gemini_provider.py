@@ -1,17 +1,49 @@
 """Gemini provider implementation."""
 from __future__ import annotations
 
+import importlib.util
 import os
+import threading
+from typing import Dict
 
+import httpx
 from google import genai
 
 from .base import ProviderConfigurationError, TranslationProvider
 
+_REQUEST_TIMEOUT_MS = 60_000
+
+# One client per API key for the whole process, so every provider instance
+# shares the same connection pools instead of re-handshaking per request.
+_CLIENTS: Dict[str, genai.Client] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _http_options() -> genai.types.HttpOptions:
+    """Request timeout plus HTTP/2 clients when the optional ``h2`` package is installed."""
+    options = {"timeout": _REQUEST_TIMEOUT_MS}
+    if importlib.util.find_spec("h2") is not None:
+        # HTTP/2 multiplexes concurrent requests over a single connection.
+        options["httpx_client"] = httpx.Client(http2=True)
+        options["httpx_async_client"] = httpx.AsyncClient(http2=True)
+    return genai.types.HttpOptions(**options)
+
+
+def _get_client(api_key: str) -> genai.Client:
+    """Return the shared client for ``api_key``, creating it on first use."""
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(api_key)
+        if client is None:
+            client = genai.Client(api_key=api_key, http_options=_http_options())
+            _CLIENTS[api_key] = client
+        return client
+
 
 class GeminiProvider(TranslationProvider):
     """Translate content using Google's Gemini API."""
 
     api_key_env = "GOOGLE_API_KEY"
+    transient_errors = (TimeoutError, ConnectionError, httpx.TransportError)
 
     def __init__(self, model: str, *, api_key: str | None = None, temperature: float = 0.3) -> None:
         super().__init__(model, temperature=temperature)
@@ -21,16 +53,35 @@ class GeminiProvider(TranslationProvider):
                 "Missing API key for provider 'Gemini'. "
                 f"Set the {self.api_key_env} environment variable."
             )
-        self.client = genai.Client(api_key=resolved_key)
+        self.client = _get_client(resolved_key)
 
-    def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+    def _build_contents(self, text: str, source_lang: str, target_lang: str) -> str:
         system_prompt = (
             "You are a translation assistant. Translate the user provided text "
             f"from {source_lang} to {target_lang} while preserving tone and formatting."
         )
+        return f"{system_prompt}\n\n{text}"
+
+    def is_transient_error(self, exc: BaseException) -> bool:
+        # google-genai reports the HTTP status as ``code`` rather than ``status_code``.
+        if isinstance(exc, genai.errors.APIError):
+            return self.is_transient_status(exc.code)
+        return super().is_transient_error(exc)
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> str:
         response = self.client.models.generate_content(
             model=self.model,
-            contents=f"{system_prompt}\n\n{text}",
+            contents=self._build_contents(text, source_lang, target_lang),
+            config=genai.types.GenerateContentConfig(
+                temperature=self.temperature,
+            ),
+        )
+        return response.text.strip()
+
+    async def translate_async(self, text: str, source_lang: str, target_lang: str) -> str:
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=self._build_contents(text, source_lang, target_lang),
             config=genai.types.GenerateContentConfig(
                 temperature=self.temperature,
             ),
@@ -1,26 +1,236 @@
 """Translation service orchestrating providers, caching and chunking."""
 from __future__ import annotations
 
+import asyncio
+import atexit
 import re
 import json
+import mmap
+import os
+import random
 import threading
 import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from hashlib import blake2b
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Coroutine, Dict, Hashable, List, Optional, Tuple, TypeVar
 
 from .providers.base import TranslationProvider
+from .utils import dumps_json, loads_json
 
+# Whitespace following a sentence terminator. The lookbehind is a single
+# fixed-width character class, so the scan is linear with no backtracking; a
+# hand-written Python character loop measured about 4x slower.
 _SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?。！？])\s+")
+# Sentence boundaries ``chunk_text`` scans for with ``str.rfind`` when a text
+# needs only a single cut; a subset of what the pattern above matches.
+_SENTENCE_BREAKS = (". ", "! ", "? ", "。 ", "！ ", "？ ")
+
+_T = TypeVar("_T")
+
+# Where a JSON array of objects (or an empty one) may start in a model response.
+_JSON_ARRAY_START_RE = re.compile(r"\[\s*[{\]]")
+# One {"id": N, "text": "..."} object, used to salvage items from a response
+# that is not valid JSON as a whole.
+_BATCH_ITEM_RE = re.compile(r'\{\s*"id"\s*:\s*"?(\d+)"?\s*,\s*"text"\s*:\s*"((?:[^"\\]|\\.)*)"\s*\}', re.DOTALL)
+
+# Default batch budget. Characters are counted on the texts only; the budget
+# leaves headroom for the instructions and JSON framing of the prompt.
+_BATCH_MAX_CHARS = 6000
+_BATCH_MAX_ITEMS = 50
+# Sub-batches of one translate_batch_json call sent at the same time.
+_BATCH_WORKERS = 4
+# Uncached chunks of one translate() call sent at the same time.
+_CHUNK_WORKERS = 8
+
+# Retry backoff: exponential from a 1 s base, capped at 30 s, plus up to 50% jitter
+# so concurrent batches that failed together do not retry in lockstep.
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 30.0
+_RETRY_JITTER = 0.5
+
+# Instructions prepended to tagged text (``<r0>...</r0>``) in single requests.
+_TAGGED_PROMPT = (
+    "Translate the following text from {source_lang} to {target_lang}. "
+    "The text contains XML-like tags (e.g., <r0>...</r0>) marking formatting. "
+    "**RULES:**\n"
+    "1. Translate ONLY the content inside the tags.\n"
+    "2. PRESERVE all tags exactly as they are.\n"
+    "3. DO NOT change the order of the tags.\n"
+    "4. DO NOT translate the tag names.\n\n"
+    "Text to translate:\n{text}"
+)
+
+# Number of cache shards; a power of two so a key's shard is a bit mask of its hash.
+_CACHE_SHARDS = 16
+# Default bound on cached entries; least recently used entries are evicted first.
+_CACHE_MAX_ENTRIES = 50_000
+
+# The cache file is an append-only JSON Lines log: a ``{"version": N}`` header
+# followed by one ``{"k": key, "v": translation}`` record per update, later
+# records winning. It is compacted once it holds more than
+# ``_CACHE_COMPACT_RATIO`` records per live entry. Version 2 keys are blake2b
+# digests (see ``TranslationService._cache_key``); version 1 logs and legacy
+# single-object files used plain "src:tgt:text" keys and are re-keyed on load.
+_CACHE_FORMAT_VERSION = 2
+_CACHE_COMPACT_RATIO = 2
+
+
+def _extract_json_array(text: str) -> Optional[str]:
+    """Return the first bracket-balanced JSON array in ``text`` (ignoring brackets in strings), or None."""
+    for match in _JSON_ARRAY_START_RE.finditer(text):
+        start = match.start()
+        depth = 0
+        in_string = False
+        escaped = False
+        for pos in range(start, len(text)):
+            ch = text[pos]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch in "[{":
+                depth += 1
+            elif ch in "]}":
+                depth -= 1
+                if depth == 0:
+                    return text[start : pos + 1]
+    return None
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Return the seconds to wait before retry number ``attempt`` (1-based)."""
+    delay = _RETRY_BASE_DELAY * 2 ** (attempt - 1) * (1 + random.uniform(0, _RETRY_JITTER))
+    return min(_RETRY_MAX_DELAY, delay)
+
+
+# Event loop shared by every service in the process. Provider clients cache
+# their async connection pools per process (see gemini_provider._CLIENTS), and
+# those pools are bound to the loop they were opened on.
+_EVENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_EVENT_LOOP_LOCK = threading.Lock()
+# Held while the shared loop runs; run_until_complete cannot be re-entered.
+_EVENT_LOOP_RUN_LOCK = threading.Lock()
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared event loop, creating it on first use."""
+    global _EVENT_LOOP
+    with _EVENT_LOOP_LOCK:
+        if _EVENT_LOOP is None or _EVENT_LOOP.is_closed():
+            _EVENT_LOOP = asyncio.new_event_loop()
+        return _EVENT_LOOP
+
+
+def _close_event_loop() -> None:
+    """Close the shared event loop; registered to run at interpreter exit."""
+    global _EVENT_LOOP
+    with _EVENT_LOOP_LOCK:
+        loop, _EVENT_LOOP = _EVENT_LOOP, None
+    if loop is not None and not loop.is_closed():
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            loop.close()
+
+
+# Services whose cache is flushed at interpreter exit. Weak references, so
+# the hook does not keep a service, its provider and its cache alive.
+_SERVICES: "weakref.WeakSet[TranslationService]" = weakref.WeakSet()
+
+
+def _flush_services() -> None:
+    """Write pending cache updates of every live service."""
+    for service in list(_SERVICES):
+        service.flush()
+
+
+# atexit runs hooks in reverse order: flush the caches, then close the loop.
+atexit.register(_close_event_loop)
+atexit.register(_flush_services)
+
+
+def _fits_in_batch(batch_chars: int, batch_items: int, text_len: int, max_chars: int, max_items: int) -> bool:
+    """Return whether a text can join a batch without exceeding either budget."""
+    return batch_items == 0 or (batch_chars + text_len <= max_chars and batch_items < max_items)
+
+
+@lru_cache(maxsize=64)
+def _batch_prompt_header(source_lang: str, target_lang: str) -> str:
+    """Return the static part of the batch prompt for a language pair."""
+    return (
+        f"You are a professional translator translating a PowerPoint presentation from {source_lang} to {target_lang}.\n"
+        "INPUT: A JSON array of objects, each with 'id' and 'text'.\n"
+        "TASK: Translate the 'text' field of each object.\n"
+        "CRITICAL RULES:\n"
+        "1. Output ONLY a valid JSON array of objects.\n"
+        "2. Each object MUST have 'id' (integer, matching input) and 'text' (translated string).\n"
+        "3. PRESERVE all <rN>...</rN> tags exactly. The tags mark formatting boundaries.\n"
+        f"4. TRANSLATE the content inside the tags. DO NOT leave it in {source_lang} unless it is a proper noun.\n"
+        "5. Do not output markdown code blocks, just raw JSON.\n\n"
+        "EXAMPLE:\n"
+        'Input: [{"id": 1, "text": "<r0>Hello</r0> <r1>World</r1>"}]\n'
+        'Output: [{"id": 1, "text": "<r0>你好</r0> <r1>世界</r1>"}]\n'
+        "(Note: The tags <r0>, <r1> are kept, but content 'Hello', 'World' is translated.)\n\n"
+        "Input JSON to translate:\n"
+    )
 
 
 class TranslationService:
     """Translate text using a configured provider with caching support."""
 
-    def __init__(self, provider: TranslationProvider, *, max_chunk_size: int = 1000, cache_file: Optional[Path] = None) -> None:
+    def __init__(
+        self,
+        provider: TranslationProvider,
+        *,
+        max_chunk_size: int = 1000,
+        max_batch_chars: int = _BATCH_MAX_CHARS,
+        max_batch_items: int = _BATCH_MAX_ITEMS,
+        cache_file: Optional[Path] = None,
+        cache_max: int = _CACHE_MAX_ENTRIES,
+    ) -> None:
         self.provider = provider
         self.max_chunk_size = max_chunk_size
-        self._cache: Dict[str, str] = {}
-        self._lock = threading.Lock()
+        self.max_batch_chars = max_batch_chars
+        self.max_batch_items = max_batch_items
+        # The cache is split into shards, each guarded by its own lock, so
+        # concurrent writers rarely contend. Reads are lock-free: a single
+        # dict.get is atomic in CPython. Each shard is an LRU holding its
+        # share of ``cache_max`` entries.
+        self._shards: List["OrderedDict[str, str]"] = [OrderedDict() for _ in range(_CACHE_SHARDS)]
+        self._shard_max = max(1, -(-cache_max // _CACHE_SHARDS))
+        self._shard_locks = [threading.Lock() for _ in range(_CACHE_SHARDS)]
+        # Updates not yet appended to the cache file, per shard.
+        self._pending: List[List[Tuple[str, str]]] = [[] for _ in range(_CACHE_SHARDS)]
+        # Serialises writes of the cache file. Re-entrant so callers can hold
+        # it around _save_cache to make an update and its save one step.
+        self._lock = threading.RLock()
+        # Records in the cache file, and whether it must be rewritten in full
+        # (missing, legacy format or cleared) rather than appended to.
+        self._log_records = 0
+        self._rewrite_log = True
+        # Cache writes are debounced: the file is written after
+        # ``_flush_every`` updates or ``_flush_interval`` seconds, by
+        # :meth:`flush`, and once more at interpreter exit.
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._updates_since_flush = 0
+        self._last_flush = time.monotonic()
+        self._flush_every = 50
+        self._flush_interval = 30.0
+        # Translations in progress, so concurrent requests for the same key
+        # wait for the first instead of calling the provider again.
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._in_flight_lock = threading.Lock()
         
         # Persistent cache setup
         self.cache_file = cache_file
@@ -30,28 +240,251 @@ class TranslationService:
              self.cache_file = Path(__file__).parent.parent / "translation_cache.json"
         
         self._load_cache()
+        _SERVICES.add(self)
+
+    def __del__(self) -> None:
+        # Services dropped before exit are no longer flushed by _flush_services.
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _cache_key(source_lang: str, target_lang: str, text: str) -> str:
+        """Return the fixed-length blake2b cache key for translating ``text`` between the given languages."""
+        data = f"{source_lang}\x00{target_lang}\x00{text}".encode("utf-8")
+        return blake2b(data, digest_size=16).hexdigest()
+
+    @staticmethod
+    def _bucket(key: str) -> int:
+        """Return the index of the shard holding ``key``."""
+        return hash(key) & (_CACHE_SHARDS - 1)
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Return the cached translation for ``key``, or None."""
+        shard = self._shards[self._bucket(key)]
+        value = shard.get(key)
+        if value is not None:
+            try:
+                shard.move_to_end(key)
+            except KeyError:
+                # Evicted by another thread since the get; the value is still valid.
+                pass
+        return value
+
+    def _cache_get_many(self, keys: List[str]) -> Dict[int, str]:
+        """Return ``{index: translation}`` for the cached ``keys``, locking each shard once."""
+        by_bucket: Dict[int, List[int]] = {}
+        for i, key in enumerate(keys):
+            by_bucket.setdefault(self._bucket(key), []).append(i)
+
+        hits: Dict[int, str] = {}
+        for bucket, indices in by_bucket.items():
+            shard = self._shards[bucket]
+            with self._shard_locks[bucket]:
+                for i in indices:
+                    value = shard.get(keys[i])
+                    if value is not None:
+                        shard.move_to_end(keys[i])
+                        hits[i] = value
+        return hits
+
+    def _cache_set(self, key: str, value: str) -> None:
+        """Store ``value`` under ``key``."""
+        bucket = self._bucket(key)
+        with self._shard_locks[bucket]:
+            self._store(self._shards[bucket], key, value)
+            self._pending[bucket].append((key, value))
+
+    def _store(self, shard: "OrderedDict[str, str]", key: str, value: str) -> None:
+        """Insert ``key`` as the most recent entry of ``shard``, evicting the least recent past capacity."""
+        shard[key] = value
+        shard.move_to_end(key)
+        while len(shard) > self._shard_max:
+            shard.popitem(last=False)
+
+    def _cache_snapshot(self) -> Dict[str, str]:
+        """Return a copy of all cached entries."""
+        snapshot: Dict[str, str] = {}
+        for shard, lock in zip(self._shards, self._shard_locks):
+            with lock:
+                snapshot.update(shard)
+        return snapshot
 
     def _load_cache(self) -> None:
         """Load cache from disk."""
         if self.cache_file and self.cache_file.exists():
             try:
-                with open(self.cache_file, "r", encoding="utf-8") as f:
-                    self._cache = json.load(f)
+                with open(self.cache_file, "rb") as f:
+                    try:
+                        # Parse straight from the mapped file rather than a full in-memory copy.
+                        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except (OSError, ValueError):
+                        # Empty file, or mmap is unavailable for it.
+                        data = f.read()
+                    try:
+                        entries, records, version, intact = self._parse_cache_log(data)
+                    finally:
+                        if isinstance(data, mmap.mmap):
+                            data.close()
+                if not isinstance(entries, dict) or type(version) is not int:
+                    raise ValueError("unrecognised cache file contents")
+                if version < _CACHE_FORMAT_VERSION:
+                    # Older file: re-key its entries and rewrite it on the next flush.
+                    entries = self._migrate_plain_keys(entries)
+                    self._dirty = True
+                elif version > _CACHE_FORMAT_VERSION:
+                    print(f"Warning: Unsupported cache file version {version}; starting with an empty cache.")
+                    return
             except Exception as e:
                 print(f"Warning: Failed to load cache file: {e}")
-                self._cache = {}
+                return
+            if version == _CACHE_FORMAT_VERSION:
+                self._log_records = records
+                # A torn or unreadable record is compacted away on the next
+                # save, rather than having new records appended onto it.
+                self._rewrite_log = not intact
+            for key, value in entries.items():
+                self._store(self._shards[self._bucket(key)], key, value)
+
+    @classmethod
+    def _migrate_plain_keys(cls, entries: Dict[str, str]) -> Dict[str, str]:
+        """Re-key entries stored under pre-version-2 "src:tgt:text" keys."""
+        migrated: Dict[str, str] = {}
+        for key, value in entries.items():
+            parts = key.split(":", 2)
+            if len(parts) == 3 and isinstance(value, str):
+                migrated[cls._cache_key(*parts)] = value
+        return migrated
+
+    @staticmethod
+    def _parse_cache_log(data: bytes | mmap.mmap) -> Tuple[Dict[str, str], int, int, bool]:
+        """Decode the cache file into (entries, record count, format version, all lines intact)."""
+        # Split on b"\n" only: UTF-8 never encodes other characters with that
+        # byte, whereas str.splitlines() would also break on U+2028 and friends.
+        size = len(data)
+        newline = data.find(b"\n")
+        line_end = newline if newline >= 0 else size
+        try:
+            header = loads_json(data[:line_end])
+        except ValueError:
+            header = None
+        if not (isinstance(header, dict) and "version" in header):
+            return loads_json(data[:]), 0, 0, True
+
+        entries: Dict[str, str] = {}
+        records = 0
+        intact = data[-1:] == b"\n"
+        pos = line_end + 1
+        while pos < size:
+            line_end = data.find(b"\n", pos)
+            if line_end < 0:
+                line_end = size
+            line = data[pos:line_end]
+            pos = line_end + 1
+            if not line:
+                continue
+            try:
+                record = loads_json(line)
+                key = record["k"]
+                # Re-insert so entries end up in order of last update, oldest first.
+                entries.pop(key, None)
+                entries[key] = record["v"]
+            except (ValueError, KeyError, TypeError):
+                # Typically a record cut short by an interrupted write.
+                intact = False
+                continue
+            records += 1
+        return entries, records, header["version"], intact
 
     def _save_cache(self) -> None:
-        """Save cache to disk."""
+        """Append pending updates to the cache log, or rewrite it when missing, legacy, cleared or oversized."""
         if self.cache_file:
             try:
                 with self._lock: # Ensure thread safety during write
-                    temp_file = self.cache_file.with_suffix(".tmp")
-                    with open(temp_file, "w", encoding="utf-8") as f:
-                        json.dump(self._cache, f, ensure_ascii=False, indent=2)
-                    temp_file.replace(self.cache_file)
+                    pending: List[Tuple[str, str]] = []
+                    for bucket, lock in enumerate(self._shard_locks):
+                        with lock:
+                            pending.extend(self._pending[bucket])
+                            self._pending[bucket] = []
+                    if not pending and not self._rewrite_log:
+                        return
+
+                    records = self._log_records + len(pending)
+                    if (
+                        self._rewrite_log
+                        or not self.cache_file.exists()
+                        or records > _CACHE_COMPACT_RATIO * max(self.cache_size(), 1)
+                    ):
+                        self._rewrite_cache_file()
+                    else:
+                        with open(self.cache_file, "a", encoding="utf-8", newline="\n") as f:
+                            f.write("".join(self._format_record(key, value) for key, value in pending))
+                        self._log_records = records
             except Exception as e:
                 print(f"Warning: Failed to save cache file: {e}")
+                # The drained records never reached the file; write everything
+                # on the next save, and make sure there is one at exit.
+                with self._lock:
+                    self._rewrite_log = True
+                with self._flush_lock:
+                    self._dirty = True
+
+    def _rewrite_cache_file(self) -> None:
+        """Atomically replace the cache file with a compacted, fsynced log of all entries."""
+        snapshot = self._cache_snapshot()
+        data = memoryview(
+            (
+                dumps_json({"version": _CACHE_FORMAT_VERSION}) + "\n"
+                + "".join(self._format_record(key, value) for key, value in snapshot.items())
+            ).encode("utf-8")
+        )
+        temp_file = self.cache_file.with_suffix(".tmp")
+        fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(temp_file, self.cache_file)
+        self._log_records = len(snapshot)
+        self._rewrite_log = False
+
+    @staticmethod
+    def _format_record(key: str, value: str) -> str:
+        """Encode one cache update as a log line."""
+        return dumps_json({"k": key, "v": value}) + "\n"
+
+    def _record_update(self, count: int = 1) -> None:
+        """Mark the cache dirty and save it once enough updates or time have accumulated."""
+        if self._mark_dirty(count):
+            self.flush()
+
+    async def _record_update_async(self, count: int = 1) -> None:
+        """Async variant of :meth:`_record_update`; the save runs off the event loop."""
+        if self._mark_dirty(count):
+            await asyncio.to_thread(self.flush)
+
+    def _mark_dirty(self, count: int) -> bool:
+        """Count ``count`` cache updates and return whether a save is due."""
+        with self._flush_lock:
+            self._dirty = True
+            self._updates_since_flush += count
+            return (
+                self._updates_since_flush >= self._flush_every
+                or time.monotonic() - self._last_flush > self._flush_interval
+            )
+
+    def flush(self) -> None:
+        """Write pending cache updates to disk."""
+        with self._flush_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._updates_since_flush = 0
+            self._last_flush = time.monotonic()
+        self._save_cache()
 
     def translate(self, text: str, source_lang: str, target_lang: str, is_tagged: bool = False) -> str:
         """Translate ``text`` and cache repeated requests.
@@ -67,108 +500,236 @@ class TranslationService:
             return text
 
         # Cache key includes languages to avoid collisions
-        cache_key = f"{source_lang}:{target_lang}:{text}"
+        cache_key = self._cache_key(source_lang, target_lang, text)
 
-        with self._lock:
-            if cache_key in self._cache:
-                return self._cache[cache_key]
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Concurrent calls for the same text share one provider request.
+        return self._singleflight(
+            ("text", cache_key),
+            cache_key,
+            lambda: self._translate_uncached(text, cache_key, source_lang, target_lang, is_tagged),
+        )
 
+    def _translate_uncached(
+        self, text: str, cache_key: str, source_lang: str, target_lang: str, is_tagged: bool
+    ) -> str:
+        """Translate ``text`` (a cache miss) and cache the result under ``cache_key``."""
         # For tagged text, we generally don't chunk because splitting tags is dangerous.
         # We rely on the provider's context window (which is large for modern models).
+        cached_as_chunk = False
         if is_tagged:
             translated = self._translate_with_retry(text, source_lang, target_lang, is_tagged=True)
         else:
             chunks = self.chunk_text(text, self.max_chunk_size)
             translated_chunks: List[str] = []
-            for chunk in chunks:
-                stripped = chunk.strip()
-                if not stripped:
+            misses: List[Tuple[int, str]] = []
+            # Check cache for individual chunks too, fetching them all at once
+            hits = self._cache_get_many([self._cache_key(source_lang, target_lang, chunk) for chunk in chunks])
+            for idx, chunk in enumerate(chunks):
+                if not chunk or chunk.isspace():
                     translated_chunks.append(chunk)
                     continue
-                
-                # Check cache for individual chunks too
-                chunk_key = f"{source_lang}:{target_lang}:{chunk}"
-                with self._lock:
-                    cached_chunk = self._cache.get(chunk_key)
-                
+
+                cached_chunk = hits.get(idx)
                 if cached_chunk:
                     translated_chunks.append(cached_chunk)
                 else:
-                    t_chunk = self._translate_with_retry(chunk, source_lang, target_lang, is_tagged=False)
-                    translated_chunks.append(t_chunk.strip())
-                    # Cache the chunk
-                    with self._lock:
-                        self._cache[chunk_key] = t_chunk.strip()
+                    translated_chunks.append("")
+                    misses.append((idx, chunk))
 
-            translated = " ".join(part for part in translated_chunks if part)
+            # Provider calls are I/O bound, so uncached chunks go out concurrently.
+            if len(misses) == 1:
+                idx, chunk = misses[0]
+                translated_chunks[idx] = self._translate_chunk(chunk, source_lang, target_lang)
+            elif misses:
+                with ThreadPoolExecutor(max_workers=min(_CHUNK_WORKERS, len(misses))) as executor:
+                    results = executor.map(
+                        lambda chunk: self._translate_chunk(chunk, source_lang, target_lang),
+                        [chunk for _, chunk in misses],
+                    )
+                    for (idx, _), t_chunk in zip(misses, results):
+                        translated_chunks[idx] = t_chunk
+
+            translated = " ".join([part for part in translated_chunks if part])
             if not translated:
                 translated = text
+            # A text that is its own single chunk shares the chunk's cache key,
+            # so _translate_chunk has already stored this result.
+            cached_as_chunk = chunks == [text] and translated == translated_chunks[0]
 
-        with self._lock:
-            self._cache[cache_key] = translated
+        if not cached_as_chunk:
+            self._cache_set(cache_key, translated)
         
-        # Save cache after update
-        self._save_cache()
+        # Save cache after enough updates; flush() writes the rest
+        self._record_update()
             
         return translated
 
+    def _singleflight(self, flight_key: Hashable, cache_key: str, compute: Callable[[], str]) -> str:
+        """Return ``compute()``, or wait for the result of a concurrent call already computing ``flight_key``."""
+        with self._in_flight_lock:
+            future = self._in_flight.get(flight_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[flight_key] = future
+        if not owner:
+            return future.result()
+
+        try:
+            # A previous owner may have cached it between our lookup and claim.
+            value = self._cache_get(cache_key)
+            if value is None:
+                value = compute()
+        except BaseException as exc:
+            with self._in_flight_lock:
+                del self._in_flight[flight_key]
+            future.set_exception(exc)
+            raise
+        with self._in_flight_lock:
+            del self._in_flight[flight_key]
+        future.set_result(value)
+        return value
+
+    def _translate_chunk(self, chunk: str, source_lang: str, target_lang: str) -> str:
+        """Translate one uncached chunk of plain text and cache the result."""
+        chunk_key = self._cache_key(source_lang, target_lang, chunk)
+
+        def _compute() -> str:
+            t_chunk = self._translate_with_retry(chunk, source_lang, target_lang, is_tagged=False).strip()
+            # Cache the chunk
+            self._cache_set(chunk_key, t_chunk)
+            return t_chunk
+
+        # A single-chunk text shares this cache key; its own flight must not wait on itself.
+        return self._singleflight(("chunk", chunk_key), chunk_key, _compute)
+
     def _translate_with_retry(self, text: str, source_lang: str, target_lang: str, is_tagged: bool = False, retries: int = 3) -> str:
         """Execute translation with retry logic."""
+        # If tagged, prepend instructions to the text or rely on system prompt in provider.
+        # Since we can't easily change the provider's system prompt per call here without changing the interface,
+        # we'll prepend a user instruction for tagged text.
+        input_text = text
+        if is_tagged:
+            input_text = _TAGGED_PROMPT.format(source_lang=source_lang, target_lang=target_lang, text=text)
+
         attempt = 0
         while attempt < retries:
             try:
-                # If tagged, prepend instructions to the text or rely on system prompt in provider.
-                # Since we can't easily change the provider's system prompt per call here without changing the interface,
-                # we'll prepend a user instruction for tagged text.
-                input_text = text
-                if is_tagged:
-                    input_text = (
-                        f"Translate the following text from {source_lang} to {target_lang}. "
-                        "The text contains XML-like tags (e.g., <r0>...</r0>) marking formatting. "
-                        "**RULES:**\n"
-                        "1. Translate ONLY the content inside the tags.\n"
-                        "2. PRESERVE all tags exactly as they are.\n"
-                        "3. DO NOT change the order of the tags.\n"
-                        "4. DO NOT translate the tag names.\n\n"
-                        f"Text to translate:\n{text}"
-                    )
-                
                 return self.provider.translate(input_text, source_lang, target_lang)
             except Exception as e:
                 attempt += 1
                 print(f"Translation failed (attempt {attempt}/{retries}): {e}")
-                if attempt >= retries:
+                # Permanent errors (auth, bad request) will not succeed on retry.
+                if attempt >= retries or not self.provider.is_transient_error(e):
                     print(f"Giving up on text: {text[:50]}...")
                     # Return original text on failure to avoid data loss, or empty?
                     # Returning original allows the process to continue.
                     return text 
-                time.sleep(1 * attempt) # Exponential backoff
+                time.sleep(_backoff_delay(attempt)) # Exponential backoff
         return text
 
     def translate_batch_json(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
-        """Translate a batch of texts using ID-based JSON objects for robust mapping."""
+        """Translate a batch of texts using ID-based JSON objects for robust mapping; cached texts are not sent."""
         if not texts:
             return []
-            
-        # Filter and prepare objects with IDs
-        items_to_translate = []
-        for i, t in enumerate(texts):
-            if t and not t.isspace():
-                items_to_translate.append({"id": i, "text": t})
-        
+
+        result, items_to_translate = self._prepare_batch_items(texts, source_lang, target_lang)
         if not items_to_translate:
-            return texts # All were empty
-            
-        print(f"[BatchTranslation] Sending {len(items_to_translate)} items. IDs: {[i['id'] for i in items_to_translate]}")
-        
+            return result # All were empty or cached
+
+        sub_batches = self._pack_batches(items_to_translate, self.max_batch_chars, self.max_batch_items)
+        if len(sub_batches) == 1:
+            translated_items = self._translate_sub_batch(sub_batches[0], source_lang, target_lang)
+        else:
+            with ThreadPoolExecutor(max_workers=min(_BATCH_WORKERS, len(sub_batches))) as executor:
+                parts = executor.map(
+                    lambda items: self._translate_sub_batch(items, source_lang, target_lang), sub_batches
+                )
+                translated_items = [item for part in parts for item in part]
+
+        result, translated_ids = self._merge_batch_response(result, items_to_translate, translated_items)
+        self._cache_batch_results(texts, result, translated_ids, source_lang, target_lang)
+        if translated_ids:
+            self._record_update(len(translated_ids))
+        return result
+
+    async def translate_batch_json_async(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """Async variant of :meth:`translate_batch_json` for concurrent dispatch."""
+        if not texts:
+            return []
+
+        result, items_to_translate = self._prepare_batch_items(texts, source_lang, target_lang)
+        if not items_to_translate:
+            return result # All were empty or cached
+
+        sub_batches = self._pack_batches(items_to_translate, self.max_batch_chars, self.max_batch_items)
+        parts = await asyncio.gather(
+            *(self._translate_sub_batch_async(items, source_lang, target_lang) for items in sub_batches)
+        )
+        translated_items = [item for part in parts for item in part]
+
+        result, translated_ids = self._merge_batch_response(result, items_to_translate, translated_items)
+        self._cache_batch_results(texts, result, translated_ids, source_lang, target_lang)
+        if translated_ids:
+            # Saving does blocking file I/O; keep it off the event loop.
+            await self._record_update_async(len(translated_ids))
+        return result
+
+    def _translate_sub_batch(self, items: List[Dict], source_lang: str, target_lang: str) -> List[Dict]:
+        """Translate one request's worth of items; a failed request yields no items."""
         try:
-            translated_items = self._translate_batch_with_retry_objects(items_to_translate, source_lang, target_lang)
+            return self._translate_batch_with_retry_objects(items, source_lang, target_lang)
         except Exception as e:
             print(f"[BatchTranslation] CRITICAL ERROR: Batch request failed completely: {e}")
-            return texts # Fallback to original
-            
+            return [] # Fallback to original
+
+    async def _translate_sub_batch_async(self, items: List[Dict], source_lang: str, target_lang: str) -> List[Dict]:
+        """Async variant of :meth:`_translate_sub_batch`."""
+        try:
+            return await self._translate_batch_with_retry_objects_async(items, source_lang, target_lang)
+        except Exception as e:
+            print(f"[BatchTranslation] CRITICAL ERROR: Batch request failed completely: {e}")
+            return [] # Fallback to original
+
+    def _prepare_batch_items(self, texts: List[str], source_lang: str, target_lang: str) -> Tuple[List[str], List[Dict]]:
+        """Return ``texts`` with cache hits substituted, and ``{"id", "text"}`` items for the rest."""
+        result = list(texts)
+        items_to_translate = []
+        candidates = [i for i, t in enumerate(texts) if t and not t.isspace()]
+        hits = self._cache_get_many([self._cache_key(source_lang, target_lang, texts[i]) for i in candidates])
+        for n, i in enumerate(candidates):
+            cached = hits.get(n)
+            if cached is not None:
+                result[i] = cached
+            else:
+                items_to_translate.append({"id": i, "text": texts[i]})
+
+        cached_count = len(hits)
+        if cached_count:
+            print(f"[BatchTranslation] {cached_count} items served from cache.")
+        if items_to_translate:
+            print(f"[BatchTranslation] Sending {len(items_to_translate)} items. IDs: {[i['id'] for i in items_to_translate]}")
+        return result, items_to_translate
+
+    def _cache_batch_results(
+        self, texts: List[str], result: List[str], translated_ids: List[int], source_lang: str, target_lang: str
+    ) -> None:
+        """Cache the batch items the provider returned a translation for."""
+        for i in translated_ids:
+            self._cache_set(self._cache_key(source_lang, target_lang, texts[i]), result[i])
+
+    @staticmethod
+    def _merge_batch_response(
+        texts: List[str], items_to_translate: List[Dict], translated_items: List[Dict]
+    ) -> Tuple[List[str], List[int]]:
+        """Map translated objects onto ``texts`` by ID, returning the merged texts and the translated IDs."""
         # Reconstruct result using ID mapping
         result = list(texts) # Copy original
+        translated_ids = []
         
         success_count = 0
         failure_count = 0
@@ -203,63 +764,143 @@ class TranslationService:
                     print(f"[BatchTranslation] Sample [Last]:  '{item['text'][:30]}...' -> '{trans_text[:30]}...'\n")
                 
                 result[original_id] = trans_text
+                translated_ids.append(original_id)
                 success_count += 1
             else:
                 print(f"[BatchTranslation] WARNING: Missing ID {original_id}. Orig: '{item['text'][:50]}...' Keeping original.")
                 failure_count += 1
                 
         print(f"[BatchTranslation] Batch Summary -> Success: {success_count}, Missing: {failure_count}")
-        return result
+        return result, translated_ids
+
+    @staticmethod
+    def _build_batch_prompt(items: List[Dict], source_lang: str, target_lang: str) -> str:
+        """Build the JSON batch translation prompt for ``items``."""
+        return _batch_prompt_header(source_lang, target_lang) + dumps_json(items)
+
+    @staticmethod
+    def _parse_batch_response(response_text: str) -> List[Dict]:
+        """Decode a provider response into translated objects, salvaging what it can; raises ValueError otherwise."""
+        # Cleanup potential markdown formatting
+        cleaned_resp = response_text.replace("```json", "").replace("```", "").strip()
+        try:
+            result = json.loads(cleaned_resp)
+        except ValueError:
+            result = None
+        if isinstance(result, list):
+            return result
+
+        array_text = _extract_json_array(response_text)
+        if array_text is not None:
+            try:
+                # strict=False accepts raw newlines/tabs inside translated strings
+                result = json.loads(array_text, strict=False)
+            except ValueError:
+                result = None
+            if isinstance(result, list):
+                return result
+
+        salvaged = []
+        for match in _BATCH_ITEM_RE.finditer(response_text):
+            try:
+                text = json.loads(f'"{match.group(2)}"', strict=False)
+            except ValueError:
+                continue
+            salvaged.append({"id": int(match.group(1)), "text": text})
+        if salvaged:
+            print(f"[BatchTranslation] Warn: Malformed JSON response, salvaged {len(salvaged)} items.")
+            return salvaged
+
+        raise ValueError("Response is not a JSON list")
+
+    def _is_retryable_batch_error(self, exc: BaseException) -> bool:
+        """Return True for transient provider errors and malformed (``ValueError``) batch responses."""
+        return isinstance(exc, ValueError) or self.provider.is_transient_error(exc)
 
     def _translate_batch_with_retry_objects(self, items: List[Dict], source_lang: str, target_lang: str, retries: int = 3) -> List[Dict]:
-        import json
-        
-        prompt = (
-            f"You are a professional translator translating a PowerPoint presentation from {source_lang} to {target_lang}.\n"
-            "INPUT: A JSON array of objects, each with 'id' and 'text'.\n"
-            "TASK: Translate the 'text' field of each object.\n"
-            "CRITICAL RULES:\n"
-            "1. Output ONLY a valid JSON array of objects.\n"
-            "2. Each object MUST have 'id' (integer, matching input) and 'text' (translated string).\n"
-            "3. PRESERVE all <rN>...</rN> tags exactly. The tags mark formatting boundaries.\n"
-            "4. TRANSLATE the content inside the tags. DO NOT leave it in {source_lang} unless it is a proper noun.\n"
-            "5. Do not output markdown code blocks, just raw JSON.\n\n"
-            "EXAMPLE:\n"
-            'Input: [{"id": 1, "text": "<r0>Hello</r0> <r1>World</r1>"}]\n'
-            f'Output: [{{"id": 1, "text": "<r0>你好</r0> <r1>世界</r1>"}}]\n'
-            "(Note: The tags <r0>, <r1> are kept, but content 'Hello', 'World' is translated.)\n\n"
-            f"Input JSON to translate:\n{json.dumps(items, ensure_ascii=False)}"
-        )
+        prompt = self._build_batch_prompt(items, source_lang, target_lang)
 
         attempt = 0
         while attempt < retries:
             try:
                 response_text = self.provider.translate(prompt, source_lang, target_lang)
-                # Cleanup potential markdown formatting
-                cleaned_resp = response_text.replace("```json", "").replace("```", "").strip()
-                
-                result = json.loads(cleaned_resp)
-                
-                if not isinstance(result, list):
-                    print(f"[BatchTranslation] Attempt {attempt+1}: Response is not a list.")
-                    raise ValueError("Response is not a JSON list")
-                    
-                return result
+                return self._parse_batch_response(response_text)
             except Exception as e:
                 attempt += 1
-                print(f"[BatchTranslation] Attempt {attempt+1}/{retries} failed: {e}")
-                if attempt >= retries:
+                print(f"[BatchTranslation] Attempt {attempt}/{retries} failed: {e}")
+                if attempt >= retries or not self._is_retryable_batch_error(e):
                     raise
-                time.sleep(1 * attempt)
+                time.sleep(_backoff_delay(attempt))
         return [] # Should not reach here due to raise
 
+    async def _translate_batch_with_retry_objects_async(self, items: List[Dict], source_lang: str, target_lang: str, retries: int = 3) -> List[Dict]:
+        prompt = self._build_batch_prompt(items, source_lang, target_lang)
+
+        attempt = 0
+        while attempt < retries:
+            try:
+                response_text = await self.provider.translate_async(prompt, source_lang, target_lang)
+                return self._parse_batch_response(response_text)
+            except Exception as e:
+                attempt += 1
+                print(f"[BatchTranslation] Attempt {attempt}/{retries} failed: {e}")
+                if attempt >= retries or not self._is_retryable_batch_error(e):
+                    raise
+                await asyncio.sleep(_backoff_delay(attempt))
+        return [] # Should not reach here due to raise
+
+    def run_coroutine(self, coro: Coroutine[Any, Any, _T]) -> _T:
+        """Run ``coro`` on the process-wide event loop; one caller at a time, never from a running loop."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            coro.close()
+            raise RuntimeError("run_coroutine() cannot be called from a running event loop; await the coroutine instead")
+        with _EVENT_LOOP_RUN_LOCK:
+            return _event_loop().run_until_complete(coro)
+
+    def fits_in_batch(self, batch_chars: int, batch_items: int, text_len: int) -> bool:
+        """Return whether a text of ``text_len`` characters can join a batch of the given size."""
+        return _fits_in_batch(batch_chars, batch_items, text_len, self.max_batch_chars, self.max_batch_items)
+
+    @staticmethod
+    def _pack_batches(
+        items: List[Dict], max_chars: int = _BATCH_MAX_CHARS, max_items: int = _BATCH_MAX_ITEMS
+    ) -> List[List[Dict]]:
+        """Split ``{"id", "text"}`` batch items into requests, preserving order."""
+        packed: List[List[Dict]] = []
+        current: List[Dict] = []
+        current_len = 0
+        for item in items:
+            text_len = len(item["text"])
+            if not _fits_in_batch(current_len, len(current), text_len, max_chars, max_items):
+                packed.append(current)
+                current = []
+                current_len = 0
+            current.append(item)
+            current_len += text_len
+        if current:
+            packed.append(current)
+        return packed
+
     @staticmethod
     def chunk_text(text: str, max_chunk_size: int = 1000) -> List[str]:
         """Split long text into smaller chunks preserving sentence boundaries."""
         if len(text) <= max_chunk_size:
             return [text]
 
-        sentences = [segment.strip() for segment in _SENTENCE_SPLIT_PATTERN.split(text) if segment.strip()]
+        if len(text) <= 2 * max_chunk_size:
+            # Slightly over the limit: one cut at the last sentence break that
+            # leaves both halves within the limit avoids the full split.
+            cut = max(text.rfind(mark, 0, max_chunk_size) for mark in _SENTENCE_BREAKS) + 1
+            if cut > 0 and len(text) - cut <= max_chunk_size:
+                head, tail = text[:cut].strip(), text[cut:].strip()
+                if head and tail:
+                    return [head, tail]
+
+        sentences = [stripped for segment in _SENTENCE_SPLIT_PATTERN.split(text) if (stripped := segment.strip())]
         if not sentences:
             sentences = [text]
 
@@ -294,11 +935,16 @@ class TranslationService:
 
     def clear_cache(self) -> None:
         """Drop cached translations."""
+        # Held throughout so a concurrent save cannot append to the old file
+        # between the clear and the rewrite.
         with self._lock:
-            self._cache.clear()
-        self._save_cache()
+            for bucket, lock in enumerate(self._shard_locks):
+                with lock:
+                    self._shards[bucket].clear()
+                    self._pending[bucket] = []
+            self._rewrite_log = True
+            self._save_cache()
 
     def cache_size(self) -> int:
         """Return the number of cached entries."""
-        with self._lock:
-            return len(self._cache)
+        return sum(len(shard) for shard in self._shards)
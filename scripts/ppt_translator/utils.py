@@ -1,8 +1,14 @@
-"""Utility helpers for CLI and filesystem handling."""
+"""Utility helpers for CLI, filesystem and JSON handling."""
 from __future__ import annotations
 
+import json
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Callable, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 
 def clean_path(path: str) -> str:
@@ -32,3 +38,26 @@ def iter_presentation_files(target: Path) -> Iterator[Path]:
     for path in target.rglob("*"):
         if path.is_file() and path.suffix.lower() in suffixes:
             yield path
+
+
+def dumps_json(
+    obj: Any,
+    *,
+    indent: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> str:
+    """Serialise ``obj`` to a JSON string, using orjson when it is installed.
+
+    ``default`` converts objects the encoder does not support natively.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False, default=default)
+
+
+def loads_json(data: str | bytes) -> Any:
+    """Parse a JSON document, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,144 @@
+"""Tests for the on-disk translation cache and batch response parsing."""
+import json
+
+import pytest
+
+from ppt_translator.providers.base import TranslationProvider
+from ppt_translator.translation import TranslationService, _CACHE_FORMAT_VERSION
+
+
+class UpperProvider(TranslationProvider):
+    """Provider that upper-cases its input and counts calls."""
+
+    def __init__(self) -> None:
+        super().__init__("test")
+        self.calls = 0
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        self.calls += 1
+        return text.upper()
+
+
+def make_service(cache_file):
+    return TranslationService(UpperProvider(), cache_file=cache_file)
+
+
+def read_lines(cache_file):
+    return cache_file.read_text(encoding="utf-8").splitlines()
+
+
+def test_round_trip(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    service = make_service(cache_file)
+    for text in ("alpha", "beta", "gamma"):
+        service.translate(text, "en", "zh")
+    service.flush()
+
+    lines = read_lines(cache_file)
+    assert json.loads(lines[0]) == {"version": _CACHE_FORMAT_VERSION}
+    assert len(lines) == 4
+
+    reloaded = make_service(cache_file)
+    assert reloaded.cache_size() == 3
+    assert reloaded.translate("beta", "en", "zh") == "BETA"
+    assert reloaded.provider.calls == 0
+
+
+def test_migrates_legacy_plain_keys(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    cache_file.write_text(json.dumps({"en:zh:hello": "你好", "en:zh:a:b": "甲"}), encoding="utf-8")
+
+    service = make_service(cache_file)
+    assert service.translate("hello", "en", "zh") == "你好"
+    # Only the first two colons separate the languages from the text.
+    assert service.translate("a:b", "en", "zh") == "甲"
+    assert service.provider.calls == 0
+
+    service.flush()
+    lines = read_lines(cache_file)
+    assert json.loads(lines[0]) == {"version": _CACHE_FORMAT_VERSION}
+    assert "en:zh:hello" not in cache_file.read_text(encoding="utf-8")
+    assert make_service(cache_file).cache_size() == 2
+
+
+def test_migrates_version_1_log(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    cache_file.write_text('{"version": 1}\n{"k": "en:zh:hello", "v": "你好"}\n', encoding="utf-8")
+
+    service = make_service(cache_file)
+    assert service.translate("hello", "en", "zh") == "你好"
+    assert service.provider.calls == 0
+
+
+@pytest.mark.parametrize(
+    "contents",
+    ["[]", '"x"', '{"version": "2"}\n', '{"version": 99}\n{"k": "a", "v": "b"}\n'],
+)
+def test_unusable_cache_file_starts_empty(tmp_path, capsys, contents):
+    cache_file = tmp_path / "cache.json"
+    cache_file.write_text(contents, encoding="utf-8")
+
+    service = make_service(cache_file)
+    assert service.cache_size() == 0
+    assert "Warning" in capsys.readouterr().out
+    assert service.translate("hello", "en", "zh") == "HELLO"
+
+
+def test_compacts_once_records_exceed_twice_the_entries(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    service = make_service(cache_file)
+    service.translate("alpha", "en", "zh")
+    service.flush()
+    key = service._cache_key("en", "zh", "alpha")
+
+    for i in range(5):
+        service._cache_set(key, f"ALPHA {i}")
+        service._record_update()
+        service.flush()
+        # Header plus at most two records for the single entry.
+        assert len(read_lines(cache_file)) <= 3
+
+    assert make_service(cache_file).translate("alpha", "en", "zh") == "ALPHA 4"
+
+
+def test_torn_tail_is_not_merged_into_the_next_append(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    service = make_service(cache_file)
+    for text in ("alpha", "beta", "gamma"):
+        service.translate(text, "en", "zh")
+    service.flush()
+    with open(cache_file, "ab") as f:
+        f.write(b'{"k": "torn", "v": "TO')
+
+    service = make_service(cache_file)
+    assert service.cache_size() == 3
+    service.translate("delta", "en", "zh")
+    service.flush()
+
+    reloaded = make_service(cache_file)
+    assert reloaded.cache_size() == 4
+    assert reloaded.translate("delta", "en", "zh") == "DELTA"
+    assert reloaded.provider.calls == 0
+
+
+def test_parse_batch_response_strips_code_fences():
+    response = '```json\n[{"id": 0, "text": "甲"}]\n```'
+    assert TranslationService._parse_batch_response(response) == [{"id": 0, "text": "甲"}]
+
+
+def test_parse_batch_response_extracts_array_from_prose():
+    response = 'Here you go:\n[{"id": 0, "text": "line\nbreak"}]\nHope this helps!'
+    assert TranslationService._parse_batch_response(response) == [{"id": 0, "text": "line\nbreak"}]
+
+
+def test_parse_batch_response_salvages_truncated_array():
+    response = '[{"id": 0, "text": "甲"}, {"id": 1, "text": "乙"}, {"id": 2, "te'
+    assert TranslationService._parse_batch_response(response) == [
+        {"id": 0, "text": "甲"},
+        {"id": 1, "text": "乙"},
+    ]
+
+
+def test_parse_batch_response_rejects_garbage():
+    with pytest.raises(ValueError):
+        TranslationService._parse_batch_response("I cannot translate this.")